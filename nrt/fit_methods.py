@@ -48,6 +48,7 @@ copyright statement below.
 
 import numpy as np
 import numba
+from scipy.linalg import solve_triangular
 
 from nrt.log import logger
 from nrt import utils
@@ -58,6 +59,10 @@ from nrt.stats import nanlstsq, mad, bisquare
 def ols(X, y):
     """Fit simple OLS model
 
+    When ``y`` does not contain any ``Nan``, all time-series share the same
+    design matrix and are solved together from a single QR decomposition of
+    ``X``. Otherwise ``nrt.stats.nanlstsq`` is used
+
     Args:
         X ((M, N) np.ndarray): Matrix of independant variables
         y ({(M,), (M, K)} np.ndarray): Matrix of dependant variables
@@ -66,7 +71,11 @@ def ols(X, y):
         beta (numpy.ndarray): The array of regression estimators
         residuals (numpy.ndarray): The array of residuals
     """
-    beta = nanlstsq(X, y)
+    if np.isnan(y).any():
+        beta = nanlstsq(X, y)
+    else:
+        Q, R = np.linalg.qr(X)
+        beta = solve_triangular(R, np.dot(Q.T, y))
     residuals = np.dot(X, beta) - y
     return beta, residuals
 
@@ -16,6 +16,7 @@
 import abc
 import warnings
 import datetime
+import functools
 
 import numpy as np
 import pandas as pd
@@ -120,9 +121,13 @@ class BaseNrt(metaclass=abc.ABCMeta):
         if not isinstance(other, type(self)):
             return False
         try:
-            if vars(self).keys() != vars(other).keys():
+            # Private (underscore prefixed) attributes are caches derived from
+            # the public state and are ignored
+            attr = {k: v for k, v in vars(self).items() if not k.startswith('_')}
+            attr_other = {k for k in vars(other) if not k.startswith('_')}
+            if attr.keys() != attr_other:
                 return False
-            for key, value in vars(self).items():
+            for key, value in attr.items():
                 if isinstance(value, np.ndarray):
                     is_equal = np.array_equal(value, getattr(other, key),
                                               equal_nan=True)
@@ -157,6 +162,49 @@ class BaseNrt(metaclass=abc.ABCMeta):
             beta (numpy.ndarray): The array of regression estimators
             residuals (numpy.ndarray): The array of residuals
 
+        Raises:
+            NotImplementedError: If method is not yet implemented
+            ValueError: Unknown value for `method`
+        """
+        beta_flat, residuals_flat, mask_bool = self._fit_flat(
+            X, dataarray, method=method, screen_outliers=screen_outliers,
+            n_threads=n_threads, **kwargs)
+        beta = self._to_raster(beta_flat, mask_bool, dtype=np.float32)
+        residuals = self._to_raster(residuals_flat, mask_bool, dtype=np.float32)
+        return beta, residuals
+
+    def _fit_flat(self, X, dataarray,
+                  method='OLS',
+                  screen_outliers=None,
+                  n_threads=1, **kwargs):
+        """Fit a regression model on the monitored pixels of an xarray.DataArray
+
+        Same as ``_fit()`` except that regression estimators and residuals are
+        only returned for the pixels of the mask that were fitted, flattened
+        along the spatial dimensions. Use ``_to_raster()`` to bring them back
+        to the spatial dimensions of the dataarray
+
+        Args:
+            X (numpy.ndarray): The design matrix used for the regression
+            dataarray (xarray.DataArray): A 3 dimension (time, y, x) DataArray
+                containing the dependant variable
+            method (str): The fitting method. Possible values include ``'OLS'``,
+                ``'RIRLS'``, ``'LASSO'``, ``'ROC'`` and ``'CCDC-stable'``.
+            screen_outliers (str): The screening method. Possible values include
+                ``'Shewhart'`` and ``'CCDC_RIRLS'``.
+            n_threads (int): Number of threads used for parallel fitting. Note that
+                parallel fitting is not supported for ``ROC``; and that argument
+                has therefore no impact when combined with ``method='ROC'``
+            **kwargs: Other parameters specific to each fit and/or outlier
+                screening method
+
+        Returns:
+            beta_flat (numpy.ndarray): The 2D array of regression estimators
+            residuals_flat (numpy.ndarray): The 2D array of residuals
+            mask_bool (numpy.ndarray): 2D boolean array of the pixels
+                corresponding to the columns of ``beta_flat`` and
+                ``residuals_flat``
+
         Raises:
             NotImplementedError: If method is not yet implemented
             ValueError: Unknown value for `method`
@@ -169,8 +217,9 @@ class BaseNrt(metaclass=abc.ABCMeta):
         # datatype (e.g. float64, float64 signature)
         # If the precision is below float64, occurences of singular matrices get
         # more likely with short time series (i.e. especially for stable fits)
-        y = dataarray.values.astype(np.float64)
-        X = X.astype(np.float64)
+        # np.asarray only copies when the datatype differs
+        y = np.asarray(dataarray.values, dtype=np.float64)
+        X = np.asarray(X, dtype=np.float64)
         # If no mask has been set at class instantiation, assume everything is forest
         if self.mask is None:
             self.mask = np.ones_like(y[0,:,:], dtype=np.uint8)
@@ -180,11 +229,6 @@ class BaseNrt(metaclass=abc.ABCMeta):
                 .astype('datetime64[D]').astype('int')
             self.fit_start = np.full_like(self.mask, start_date, dtype=np.uint16)
         mask_bool = self.mask == 1
-        shape = y.shape
-        beta_shape = (X.shape[1], shape[1], shape[2])
-        # Create empty arrays with output shapes to store reg coefficients and residuals
-        beta = np.zeros(beta_shape, dtype=np.float32)
-        residuals = np.zeros_like(y, dtype=np.float32)
         y_flat = y[:, mask_bool]
         y_flat = self._mask_short_series(y_flat, X)
 
@@ -195,10 +239,10 @@ class BaseNrt(metaclass=abc.ABCMeta):
             y_flat = self._mask_short_series(y_flat, X)
         elif screen_outliers == 'CCDC_RIRLS':
             try:
-                green_flat = kwargs.pop('green').values\
-                    .astype(np.float64)[:, self.mask == 1]
-                swir_flat = kwargs.pop('swir').values\
-                    .astype(np.float64)[:, self.mask == 1]
+                green_flat = kwargs.pop('green').values[:, self.mask == 1]\
+                    .astype(np.float64)
+                swir_flat = kwargs.pop('swir').values[:, self.mask == 1]\
+                    .astype(np.float64)
             except (KeyError, AttributeError):
                 raise ValueError('green and swir xarray.Dataarray(s) need to be'
                                  ' provided using green and swir arguments'
@@ -244,9 +288,27 @@ class BaseNrt(metaclass=abc.ABCMeta):
         else:
             raise ValueError('Unknown method')
 
-        beta[:, mask_bool] = beta_flat
-        residuals[:, mask_bool] = residuals_flat
-        return beta, residuals
+        return beta_flat, residuals_flat, mask_bool
+
+    @staticmethod
+    def _to_raster(flat, mask_bool, dtype=None):
+        """Scatter flattened per pixel values back to the spatial dimensions
+
+        Args:
+            flat (numpy.ndarray): Array whose last dimension corresponds to the
+                ``True`` elements of ``mask_bool``
+            mask_bool (numpy.ndarray): 2D boolean array
+            dtype (type): Datatype of the returned array. Defaults to the
+                datatype of ``flat``
+
+        Returns:
+            numpy.ndarray: Array of shape ``(*flat.shape[:-1], *mask_bool.shape)``,
+                filled with zeros outside of ``mask_bool``
+        """
+        dtype = flat.dtype if dtype is None else dtype
+        out = np.zeros(flat.shape[:-1] + mask_bool.shape, dtype=dtype)
+        out[..., mask_bool] = flat
+        return out
 
     @abc.abstractmethod
     def fit(self):
@@ -384,8 +446,9 @@ class BaseNrt(metaclass=abc.ABCMeta):
         else:
             y_res = abs(self.y[0] - self.y[1])
             x_res = abs(self.x[0] - self.x[1])
-            y_0 = np.max(self.y) + y_res / 2
-            x_0 = np.min(self.x) - x_res / 2
+            # Coordinates are regularly spaced, extremes are at either end
+            y_0 = max(self.y[0], self.y[-1]) + y_res / 2
+            x_0 = min(self.x[0], self.x[-1]) - x_res / 2
             aff = Affine(x_res, 0, x_0,
                          0, -y_res, y_0)
         return aff
@@ -436,8 +499,9 @@ class BaseNrt(metaclass=abc.ABCMeta):
         return cls(**d)
 
     def to_netcdf(self, filename):
-        # List all attributes remove
-        attr = vars(self)
+        # List all attributes, except private ones (caches derived from the
+        # public attributes)
+        attr = {k: v for k, v in vars(self).items() if not k.startswith('_')}
         with Dataset(filename, 'w') as dst:
             # define variable
             x_dim = dst.createDimension('x', len(self.x))
@@ -449,6 +513,8 @@ class BaseNrt(metaclass=abc.ABCMeta):
             x_var[:] = self.x
             y_var[:] = self.y
 
+            # Spatial chunks of 2D and 3D variables (compressed)
+            chunksizes = (min(256, len(self.y)), min(256, len(self.x)))
             # Starting letter for third dimensions
             third = 'a'
             for k,v in attr.items():
@@ -460,15 +526,17 @@ class BaseNrt(metaclass=abc.ABCMeta):
                             var_3[:] = np.arange(start=0,
                                                  stop=v.shape[0],
                                                  dtype=np.uint8)
-                            var_3d = dst.createVariable(k, v.dtype,
-                                                        (third, 'y', 'x'),
-                                                        zlib=True)
+                            var_3d = dst.createVariable(
+                                k, v.dtype, (third, 'y', 'x'), zlib=True,
+                                chunksizes=(v.shape[0], *chunksizes))
                             var_3d[:] = v
                             third = chr(ord(third) + 1)
                             continue
                         # bool array are stored as int8
                         dtype = np.uint8 if v.dtype == bool else v.dtype
-                        new_var = dst.createVariable(k, dtype, ('y', 'x'))
+                        new_var = dst.createVariable(k, dtype, ('y', 'x'),
+                                                     zlib=True,
+                                                     chunksizes=chunksizes)
                         new_var[:] = v
                         if v.dtype == bool:
                             new_var.setncattr('dtype', 'bool')
@@ -516,10 +584,7 @@ class BaseNrt(metaclass=abc.ABCMeta):
         Returns:
             numpy.ndarray: A matrix of regressors
         """
-        date_pd = pd.DatetimeIndex([date])
-        X = build_regressors(dates=date_pd, trend=self.trend,
-                             harmonic_order=self.harmonic_order)
-        return X
+        return _date_regressors(date, self.trend, self.harmonic_order)
 
     def _mask_short_series(self, y_flat, X):
         """ Masks short time series
@@ -544,3 +609,16 @@ class BaseNrt(metaclass=abc.ABCMeta):
         if not np.any(self.mask == 1):
             raise ValueError(f'There are no time-series with sufficient ({int(X.shape[1]*1.5)}) data points.')
         return y_flat[:,~likely_singular]
+
+
+@functools.lru_cache(maxsize=4096)
+def _date_regressors(date, trend, harmonic_order):
+    """Build (and memoize) the matrix of regressors for a single date
+
+    The returned array is shared between calls and is therefore read-only
+    """
+    date_pd = pd.DatetimeIndex([date])
+    X = build_regressors(dates=date_pd, trend=trend,
+                         harmonic_order=harmonic_order)
+    X.flags.writeable = False
+    return X
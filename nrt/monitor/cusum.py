@@ -17,7 +17,8 @@ import numpy as np
 import xarray as xr
 
 from nrt.monitor import BaseNrt
-from nrt.utils_efp import _cusum_ols_test_crit
+from nrt.utils_efp import (_cusum_ols_test_crit, _cusum_update,
+                           _residuals_inv_norm)
 
 
 class CuSum(BaseNrt):
@@ -79,6 +80,7 @@ class CuSum(BaseNrt):
         self.histsize = kwargs.get('histsize')
         self.n = kwargs.get('n')
         self.monitoring_strategy = 'CUSUM'
+        self._inv_norm = None
 
     def fit(self, dataarray, method='ROC', alpha=0.05, **kwargs):
         """Stable history model fitting
@@ -93,39 +95,46 @@ class CuSum(BaseNrt):
             alpha (float): Significance level for ``'ROC'`` stable fit.
             **kwargs: to be passed to ``_fit``
         """
+        self._inv_norm = None
         self.set_xy(dataarray)
         X = self.build_design_matrix(dataarray, trend=self.trend,
                                      harmonic_order=self.harmonic_order)
-        self.beta, residuals = self._fit(X, dataarray,
-                                         method=method,
-                                         alpha=alpha,
-                                         **kwargs)
+        # Statistics of the history period are computed on the flat array of
+        # monitored pixels only; avoids scattering the residuals back to a
+        # (time, y, x) array
+        beta_flat, residuals_flat, mask_bool = self._fit_flat(X, dataarray,
+                                                              method=method,
+                                                              alpha=alpha,
+                                                              **kwargs)
+        self.beta = self._to_raster(beta_flat, mask_bool, dtype=np.float32)
 
         # histsize is necessary for normalization of residuals,
         # n is necessary for boundary calculation
-        self.histsize = np.sum(~np.isnan(residuals), axis=0)\
-            .astype(np.uint16)
-        self.n = self.histsize
+        histsize = np.sum(~np.isnan(residuals_flat), axis=0).astype(np.uint16)
+        sigma = np.nanstd(residuals_flat, axis=0, ddof=X.shape[1])
+        self.histsize = self._to_raster(histsize, mask_bool)
+        self.n = self.histsize.copy()
         self.boundary = np.full_like(self.histsize, np.nan, dtype=np.float32)
-        self.sigma = np.nanstd(residuals, axis=0, ddof=X.shape[1])
-        # calculate process and normalize it using sigma and histsize
-        with np.errstate(divide='ignore', invalid='ignore'):
-            residuals_ = residuals / (self.sigma*np.sqrt(self.histsize))
-        self.process = np.nancumsum(residuals_, axis=0)[-1]
+        self.sigma = self._to_raster(sigma, mask_bool, dtype=np.float32)
+        # calculate process (sum of residuals) and normalize it using sigma
+        # and histsize
+        with np.errstate(invalid='ignore'):
+            residuals_flat *= self._get_inv_norm()[mask_bool]
+        process = np.nansum(residuals_flat, axis=0)
+        self.process = self._to_raster(process, mask_bool, dtype=np.float32)
+
+    def _get_inv_norm(self):
+        """Reciprocal of the residuals normalization factor
+
+        Invariant after fitting; computed once (at fit time or on first use
+        after ``.from_netcdf()``) and cached
+        """
+        if self._inv_norm is None:
+            self._inv_norm = _residuals_inv_norm(self.sigma, self.histsize)
+        return self._inv_norm
 
     def _update_process(self, residuals, is_valid):
-        with np.errstate(divide='ignore', invalid='ignore'):
-            # calculate boundary
-            self.n = self.n + is_valid
-            x = self.n / self.histsize
-            self.boundary = np.where(is_valid,
-                                     np.sqrt(x * (x - 1)
-                                        * (self.critval**2
-                                           + np.log(x / (x - 1)))),
-                                     self.boundary)
-            # normalize residuals
-            residuals_norm = residuals / (self.sigma*np.sqrt(self.histsize))
-        # Update process
-        self.process = np.where(is_valid,
-                                self.process+residuals_norm,
-                                self.process)
+        _cusum_update(np.asarray(self.process), np.asarray(self.boundary),
+                      np.asarray(self.n), np.asarray(self.histsize),
+                      self._get_inv_norm(), residuals, is_valid,
+                      self.critval)
@@ -17,7 +17,8 @@ import numpy as np
 import xarray as xr
 
 from nrt.monitor import BaseNrt
-from nrt.utils_efp import _mosum_ols_test_crit, _mosum_init_window
+from nrt.utils_efp import (_mosum_ols_test_crit, _mosum_init_window,
+                           _residuals_inv_norm)
 
 
 class MoSum(BaseNrt):
@@ -92,6 +93,7 @@ class MoSum(BaseNrt):
         self.winsize = kwargs.get('winsize')
         self.window = kwargs.get('window')
         self.monitoring_strategy = 'MOSUM'
+        self._inv_norm = None
 
     def get_process(self):
         return np.nansum(self.window, axis=0)
@@ -114,6 +116,7 @@ class MoSum(BaseNrt):
             alpha (float): Significance level for ``'ROC'`` stable fit.
             **kwargs: to be passed to ``_fit``
         """
+        self._inv_norm = None
         self.set_xy(dataarray)
         X = self.build_design_matrix(dataarray, trend=self.trend,
                                      harmonic_order=self.harmonic_order)
@@ -132,12 +135,22 @@ class MoSum(BaseNrt):
         self.boundary = np.full_like(self.histsize, np.nan, dtype=np.float32)
         self.sigma = np.nanstd(residuals, axis=0, ddof=X.shape[1])
         # calculate normalized residuals
-        with np.errstate(divide='ignore', invalid='ignore'):
-            residuals_ = residuals / (self.sigma * np.sqrt(self.histsize))
+        with np.errstate(invalid='ignore'):
+            residuals_ = residuals * self._get_inv_norm()
         # TODO self.window can be converted to property to allow for safe
         #   application of scaling factor with getter and setter
         self.window = _mosum_init_window(residuals_, self.winsize)
 
+    def _get_inv_norm(self):
+        """Reciprocal of the residuals normalization factor
+
+        Invariant after fitting; computed once (at fit time or on first use
+        after ``.from_netcdf()``) and cached
+        """
+        if self._inv_norm is None:
+            self._inv_norm = _residuals_inv_norm(self.sigma, self.histsize)
+        return self._inv_norm
+
     def _update_process(self, residuals, is_valid):
         """Update process
         (Isn't actually updating process directly, but is updating the values
@@ -148,8 +161,8 @@ class MoSum(BaseNrt):
         # get indices which need to be changed and write normalized residuals
         with np.errstate(divide='ignore', invalid='ignore'):
             change_idx = np.mod(self.n-self.histsize, self.winsize)[valid_idx]
-            residuals_norm = residuals / (self.sigma * np.sqrt(self.histsize))
-            self.window[change_idx, valid_idx[0], valid_idx[1]] = residuals_norm[valid_idx]
+            residuals_norm = residuals[valid_idx] * self._get_inv_norm()[valid_idx]
+            self.window[change_idx, valid_idx[0], valid_idx[1]] = residuals_norm
 
             # calculate boundary
             self.n = self.n + is_valid
@@ -15,14 +15,24 @@
 
 import numba
 import numpy as np
+from scipy.linalg import solve_triangular
+from scipy.special import erfc
 
 
-@numba.jit(nopython=True, cache=True, parallel=True)
 def nanlstsq(X, y):
     """Return the least-squares solution to a linear matrix equation
 
     Analog to ``numpy.linalg.lstsq`` for dependant variable containing ``Nan``
 
+    Columns of ``y`` sharing the same pattern of missing values share the same
+    subset of ``X`` and therefore the same normal equations. The Cholesky
+    factorization of these normal equations is computed once per pattern
+    within every block of consecutive columns, and every column is then solved
+    by forward and backward substitution. Blocks are processed in parallel
+    using numba. To preserve accuracy with badly conditioned design matrices
+    (e.g. short time-series with a trend regressor), normal equations are
+    formed from the orthonormal factor of the QR decomposition of ``X``.
+
     Note:
         For best performances of the multithreaded implementation, it is
         recommended to limit the number of threads used by MKL or OpenBLAS to 1.
@@ -58,16 +68,130 @@ def nanlstsq(X, y):
     Returns:
         np.ndarray: Least-squares solution, ignoring ``Nan``
     """
-    beta = np.zeros((X.shape[1], y.shape[1]), dtype=np.float64)
-    for idx in numba.prange(y.shape[1]):
-        # subset y and X
-        isna = np.isnan(y[:,idx])
-        X_sub = X[~isna]
-        y_sub = y[~isna,idx]
-        beta[:, idx] = np.linalg.solve(np.dot(X_sub.T, X_sub), np.dot(X_sub.T, y_sub))
+    # Identify groups of columns with identical nan patterns. Patterns are bit
+    # packed along the time dimension and every packed column is viewed as a
+    # single fixed width key, so that a 1D (much faster than row wise) unique
+    # can be used
+    packed = np.ascontiguousarray(np.packbits(np.isnan(y), axis=0).T)
+    keys = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+    _, group = np.unique(keys, return_inverse=True)
+    # Normal equations are formed from the orthonormal factor of the QR
+    # decomposition of X rather than from X itself (e.g. the trend regressor
+    # makes X.T X very badly conditioned). beta is recovered from R
+    Q, R = np.linalg.qr(X)
+    gamma = _grouped_cholesky_solve(np.ascontiguousarray(Q), y, group.ravel())
+    return solve_triangular(R, gamma)
+
+
+@numba.jit(nopython=True, cache=True, parallel=True)
+def _grouped_cholesky_solve(X, y, group, blocksize=1024):
+    """Solve normal equations of columns grouped by their pattern of valid data
+
+    Blocks of consecutive columns are processed in parallel. Within a block,
+    the Cholesky factorization of the normal equations is computed once per
+    group and used to solve every column of that group. Groups whose normal
+    equations are not numerically positive definite are solved using
+    ``np.linalg.solve``
+
+    Args:
+        X ((M, N) np.ndarray): Matrix of independant variables
+        y ((M, K) np.ndarray): Matrix of dependant variables
+        group ((K,) np.ndarray): Group (nan pattern) index of every column
+        blocksize (int): Number of consecutive columns per block
+
+    Returns:
+        np.ndarray: Least-squares solution
+    """
+    n = X.shape[1]
+    beta = np.zeros((n, y.shape[1]), dtype=np.float64)
+    n_blocks = (y.shape[1] + blocksize - 1) // blocksize
+    for block in numba.prange(n_blocks):
+        start = block * blocksize
+        stop = min(start + blocksize, y.shape[1])
+        cols = start + np.argsort(group[start:stop], kind='mergesort')
+        idx = 0
+        while idx < cols.size:
+            current = group[cols[idx]]
+            is_valid = ~np.isnan(y[:, cols[idx]])
+            X_sub = X[is_valid]
+            XTX = np.dot(X_sub.T, X_sub)
+            L, is_pd = _cholesky(XTX)
+            while idx < cols.size and group[cols[idx]] == current:
+                col = cols[idx]
+                XTy = np.dot(X_sub.T, y[is_valid, col])
+                if is_pd:
+                    beta[:, col] = _cho_solve(L, XTy)
+                else:
+                    beta[:, col] = np.linalg.solve(XTX, XTy)
+                idx += 1
     return beta
 
 
+@numba.jit(nopython=True, cache=True)
+def _cholesky(A):
+    """Cholesky factorization of a symmetric positive definite matrix
+
+    Equivalent of ``np.linalg.cholesky`` that does not raise when ``A`` is not
+    numerically positive definite (raising from within a ``numba.prange``
+    loop would abort the whole computation)
+
+    Args:
+        A ((N, N) np.ndarray): Symmetric matrix
+
+    Returns:
+        tuple: Lower triangular Cholesky factor of ``A`` and a boolean
+        indicating whether the factorization succeeded
+    """
+    n = A.shape[0]
+    L = np.zeros_like(A)
+    for j in range(n):
+        acc = A[j, j]
+        for k in range(j):
+            acc -= L[j, k] ** 2
+        if not acc > 0:
+            return L, False
+        L[j, j] = np.sqrt(acc)
+        for i in range(j + 1, n):
+            acc = A[i, j]
+            for k in range(j):
+                acc -= L[i, k] * L[j, k]
+            L[i, j] = acc / L[j, j]
+    return L, True
+
+
+@numba.jit(nopython=True, cache=True)
+def _cho_solve(L, b):
+    """Solve ``A x = b`` given the Cholesky factorization of ``A``
+
+    Numba compatible equivalent of ``scipy.linalg.cho_solve``. Forward and
+    backward substitutions are used in place of the inversion of ``A``
+
+    Args:
+        L ((N, N) np.ndarray): Lower triangular Cholesky factor of ``A`` (e.g.
+            as returned by ``np.linalg.cholesky(X.T X)``)
+        b ((N,) np.ndarray): Right hand side vector
+
+    Returns:
+        np.ndarray: Solution ``x``
+    """
+    n = L.shape[0]
+    # Forward substitution (L z = b)
+    z = np.empty(n, dtype=L.dtype)
+    for i in range(n):
+        acc = b[i]
+        for j in range(i):
+            acc -= L[i, j] * z[j]
+        z[i] = acc / L[i, i]
+    # Backward substitution (L.T x = z)
+    x = np.empty(n, dtype=L.dtype)
+    for i in range(n - 1, -1, -1):
+        acc = z[i]
+        for j in range(i + 1, n):
+            acc -= L[j, i] * x[j]
+        x[i] = acc / L[i, i]
+    return x
+
+
 @numba.jit(nopython=True, cache=True)
 def mad(resid, c=0.6745):
     """Returns Median-Absolute-Deviation (MAD) for residuals
@@ -82,8 +206,25 @@ def mad(resid, c=0.6745):
     Reference:
         http://en.wikipedia.org/wiki/Median_absolute_deviation
     """
+    resid = resid[~np.isnan(resid)]
+    if resid.size == 0:
+        return np.nan
     # Return median absolute deviation adjusted sigma
-    return np.nanmedian(np.fabs(resid - np.nanmedian(resid))) / c
+    return _median(np.fabs(resid - _median(resid))) / c
+
+
+@numba.jit(nopython=True, cache=True)
+def _median(x):
+    """Median of a 1D array without ``Nan``
+
+    Uses partial sorting (``np.partition``, O(n)) instead of a full sort
+    """
+    k = x.size // 2
+    part = np.partition(x, k)
+    if x.size % 2:
+        return part[k]
+    # Elements before k are all smaller or equal to part[k]
+    return (part[k] + np.max(part[:k])) / 2
 
 # Weight scaling methods
 @numba.jit(nopython=True, cache=True)
@@ -127,12 +268,29 @@ def ncdf(x):
     return 1. - 0.5*erfcc(x/(2**0.5))
 
 
-@numba.jit(nopython=True, cache=True)
+def ncdf_vec(x):
+    """Vectorized normal cumulative distribution function
+
+    Array counterpart of ``ncdf`` relying on the ``scipy.special.erfc`` ufunc.
+    ``ncdf`` should still be used from within numba compiled functions
+
+    Args:
+        x (array-like): Values at which to evaluate the cumulative distribution
+            function
+
+    Returns:
+        np.ndarray: Cumulative distribution function values
+    """
+    return 0.5 * erfc(-np.asarray(x) / np.sqrt(2))
+
+
 def nan_percentile_axis0(arr, percentiles):
     """Faster implementation of np.nanpercentile
 
     This implementation always takes the percentile along axis 0.
-    Uses numba to speed up the calculation by more than 7x.
+    All columns are sorted at once (``Nan`` are sorted last) and percentiles
+    are linearly interpolated from the number of valid observations of each
+    column, instead of calling ``np.nanpercentile`` column by column.
 
     Function is equivalent to np.nanpercentile(arr, <percentiles>, axis=0)
 
@@ -146,9 +304,17 @@ def nan_percentile_axis0(arr, percentiles):
 
     """
     shape = arr.shape
-    arr = arr.reshape((arr.shape[0], -1))
+    arr = np.sort(arr.reshape((arr.shape[0], -1)), axis=0)
+    n_valid = np.count_nonzero(~np.isnan(arr), axis=0)
+    last = np.maximum(n_valid - 1, 0)
     out = np.empty((len(percentiles), arr.shape[1]))
-    for i in range(arr.shape[1]):
-        out[:,i] = np.nanpercentile(arr[:,i], percentiles)
+    for i, percentile in enumerate(percentiles):
+        idx = percentile / 100 * last
+        lower = np.floor(idx).astype(np.intp)
+        upper = np.minimum(lower + 1, last)
+        lower_values = np.take_along_axis(arr, lower[np.newaxis], axis=0)[0]
+        upper_values = np.take_along_axis(arr, upper[np.newaxis], axis=0)[0]
+        out[i] = lower_values + (upper_values - lower_values) * (idx - lower)
+    out[:, n_valid == 0] = np.nan
     shape = (out.shape[0], *shape[1:])
     return out.reshape(shape)
@@ -44,15 +44,13 @@ def build_regressors(dates, trend=True, harmonic_order=3):
         origin = pd.Timestamp(1970)
         X[:,1] = (dates - origin).days
     if harmonic_order:
-        indices = range(1 + trend, 1 + trend + 2 * harmonic_order)
         # Array of decimal dates
         ddates = datetimeIndex_to_decimal_dates(dates)
-        # Allocate array
-        X_harmon = np.empty((len(dates), harmonic_order))
+        # Cosine terms first, then sine terms, written directly into X
         for i in range(harmonic_order):
-            X_harmon[:,i] = 2 * np.pi * ddates * (i + 1)
-        X_harmon = np.concatenate([np.cos(X_harmon), np.sin(X_harmon)], 1)
-        X[:, indices] = X_harmon
+            X_harmon = 2 * np.pi * ddates * (i + 1)
+            X[:, 1 + trend + i] = np.cos(X_harmon)
+            X[:, 1 + trend + harmonic_order + i] = np.sin(X_harmon)
     return X
 
 
@@ -66,11 +64,16 @@ def dt_to_decimal(dt):
 
 
 def datetimeIndex_to_decimal_dates(dates):
-    """Convert a pandas datetime index to decimal dates"""
-    years = dates.year
-    first_year_day = pd.to_datetime({'year':years, 'day':1, 'month':1})
-    last_year_day = pd.to_datetime({'year':years, 'day':31, 'month':12})
-    ddates = years + (dates - first_year_day)/(last_year_day - first_year_day)
+    """Convert a pandas datetime index to decimal dates
+
+    Computed with numpy datetime64 arithmetic over the whole index at once
+    """
+    dates = np.asarray(dates, dtype='datetime64[ns]')
+    years = dates.astype('datetime64[Y]')
+    first_year_day = years.astype('datetime64[ns]')
+    last_year_day = ((years + 1).astype('datetime64[D]') - 1).astype('datetime64[ns]')
+    ddates = years.astype(int) + 1970 \
+        + (dates - first_year_day) / (last_year_day - first_year_day)
     return np.array(ddates, dtype=float)
 
 
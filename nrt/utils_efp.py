@@ -189,6 +189,64 @@ def _mosum_init_window(residuals, winsize):
     return res
 
 
+def _residuals_inv_norm(sigma, histsize):
+    """Reciprocal of the CUSUM and MOSUM residuals normalization factor
+
+    A null normalization factor results in ``inf`` (or ``Nan``) values, like
+    a division would
+
+    Args:
+        sigma (np.ndarray): 2D array of standard deviation of the residuals in
+            the history period
+        histsize (np.ndarray): 2D array of number of non-nan observations in
+            history period
+
+    Returns:
+        np.ndarray: 2D float32 array of ``1 / (sigma * sqrt(histsize))``
+    """
+    # Arrays reloaded from netcdf are masked arrays; masked division would
+    # silently hide null denominators
+    sigma = np.ma.getdata(sigma)
+    histsize = np.ma.getdata(histsize)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.asarray(1 / (sigma * np.sqrt(histsize)), dtype=np.float32)
+
+
+@numba.jit(nopython=True, cache=True, parallel=True, error_model='numpy')
+def _cusum_update(process, boundary, n, histsize, inv_norm, residuals,
+                  is_valid, critval):
+    """Update OLS-CUSUM process and boundary in place given new residuals
+
+    All arrays are walked a single time, pixel by pixel, so that the state of
+    a pixel is read and updated at once rather than through a sequence of
+    full array operations. Rows are processed in parallel; the number of
+    threads can be controlled using the ``numba.set_num_threads`` function
+
+    Args:
+        process (np.ndarray): 2D array of process values
+        boundary (np.ndarray): 2D array of boundary values
+        n (np.ndarray): 2D array of total number of non-nan observations
+        histsize (np.ndarray): 2D array of number of non-nan observations in
+            history period
+        inv_norm (np.ndarray): 2D array of the reciprocal of the residuals
+            normalization factor (``1 / (sigma * sqrt(histsize))``)
+        residuals (np.ndarray): 2D array of residuals of the new acquisition
+        is_valid (np.ndarray): 2D boolean array indicating where process
+            values should be updated
+        critval (float): Critical test value
+    """
+    critval_sq = critval ** 2
+    for i in numba.prange(process.shape[0]):
+        for j in range(process.shape[1]):
+            if not is_valid[i, j]:
+                continue
+            n[i, j] += 1
+            x = n[i, j] / histsize[i, j]
+            boundary[i, j] = np.sqrt(x * (x - 1)
+                                     * (critval_sq + np.log(x / (x - 1))))
+            process[i, j] += residuals[i, j] * inv_norm[i, j]
+
+
 @numba.jit(nopython=True, cache=True)
 def _cusum_rec_efp(X, y):
     """ Equivalent to ``strucchange::efp`` for Rec-CUSUM """
@@ -16,6 +16,7 @@
 from pathlib import Path
 import pytest
 import numpy as np
+import xarray as xr
 
 here = Path(__file__).parent
 
@@ -190,3 +191,25 @@ def sm_RLM_result(request):
        ['-0.7172424822211365', '-49.52111301879781'],
        ['1.2701246101474761', '-38.324020145702654'],
        ['1.1329168669944791', '-9.034638787625045']], dtype='<U32').astype(np.float64)
+
+
+# Small synthetic (time, y, x) cube of harmonic time-series with missing
+# values; pixel (0, 0) is constant (null residuals) during the history period
+@pytest.fixture
+def history_monitoring_synthetic(request):
+    np.random.seed(0)
+    dates = np.arange('2018-01-01', '2021-01-01', 8, dtype='datetime64[D]')
+    t = (dates - dates[0]).astype(np.float64) / 365.25
+    shape = (dates.size, 4, 5)
+    values = 0.7 + 0.1 * np.sin(2 * np.pi * t)[:, np.newaxis, np.newaxis] \
+        + np.random.normal(0, 0.02, shape)
+    values[np.random.rand(*shape) < 0.2] = np.nan
+    is_history = dates < np.datetime64('2020-01-01')
+    values[is_history, 0, 0] = 0
+    da = xr.DataArray(values, dims=['time', 'y', 'x'],
+                      coords={'time': dates,
+                              'y': np.arange(4) * -20. + 5000.,
+                              'x': np.arange(5) * 20. + 3000.})
+    monitoring = da.sel(time=~is_history)
+    monitoring_dates = monitoring.time.values.astype('datetime64[s]').tolist()
+    return da.sel(time=is_history), monitoring.values, monitoring_dates
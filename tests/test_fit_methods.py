@@ -14,9 +14,12 @@
 # limitations under the Licence.
 
 import numpy as np
+import pandas as pd
+import pytest
 
 import nrt.fit_methods as fm
 import nrt.stats as st
+from nrt.utils import build_regressors
 
 
 def test_rirls(X_y_RLM, sm_RLM_result):
@@ -43,3 +46,36 @@ def test_ccdc_stable_fit(stability_ccdc, threshold=3):
     X, y, dates, result = stability_ccdc
     beta, resid, stable, start = fm.ccdc_stable_fit(X, y, dates, threshold)
     np.testing.assert_array_equal(result, stable)
+
+
+def test_ols(X_y_dates_romania):
+    X, y, dates = X_y_dates_romania
+    y_clear = np.nan_to_num(y)
+    # No nan, QR decomposition path
+    beta, residuals = fm.ols(X, y_clear)
+    np.testing.assert_allclose(beta, np.linalg.lstsq(X, y_clear, rcond=None)[0])
+    np.testing.assert_allclose(residuals, np.dot(X, beta) - y_clear)
+    # No nan, badly conditioned design matrix (normal equations are not
+    # numerically positive definite)
+    X_ill = np.c_[np.ones(20), 1 + 1e-9 * np.arange(20)]
+    y_ill = np.random.default_rng(0).normal(size=(20, 3))
+    beta_ill, _ = fm.ols(X_ill, y_ill)
+    np.testing.assert_allclose(beta_ill,
+                               np.linalg.lstsq(X_ill, y_ill, rcond=None)[0])
+    # With nan, should be consistent with nanlstsq
+    beta_nan, residuals_nan = fm.ols(X, y)
+    np.testing.assert_allclose(beta_nan, st.nanlstsq(X, y))
+    assert np.array_equal(np.isnan(residuals_nan), np.isnan(y))
+
+
+@pytest.mark.parametrize('n_obs, freq', [(30, '5D'), (12, '10D')])
+def test_ols_short_series(n_obs, freq):
+    # Nan free short time-series with a trend regressor in days since epoch;
+    # normal equations of X are very badly conditioned
+    dates = pd.date_range('2016-01-01', periods=n_obs, freq=freq)
+    X = build_regressors(dates, trend=True, harmonic_order=3)
+    y = np.random.default_rng(0).normal(0.6, 0.1, (n_obs, 50))
+    beta, _ = fm.ols(X, y)
+    expected = np.linalg.lstsq(X, y, rcond=None)[0]
+    np.testing.assert_allclose(np.dot(X, beta), np.dot(X, expected),
+                               atol=1e-8)
@@ -0,0 +1,88 @@
+# Copyright (C) 2022 European Union (Joint Research Centre)
+#
+# Licensed under the EUPL, Version 1.2 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+
+import pytest
+import numpy as np
+
+from nrt.monitor import cusum, mosum
+
+# The MoSum moving window cannot be initialized for a constant history
+# (all normalized residuals are Nan); that pixel is therefore not monitored
+monitor_params = {
+    'CUSUM': pytest.param(cusum.CuSum, True, marks=pytest.mark.cusum),
+    'MOSUM': pytest.param(mosum.MoSum, False, marks=pytest.mark.mosum),
+}
+
+@pytest.mark.parametrize('monitor_cls, monitor_constant',
+                         monitor_params.values(), ids=monitor_params.keys())
+def test_netcdf_monitor(monitor_cls, monitor_constant,
+                        history_monitoring_synthetic, tmp_path):
+    """Monitoring a reloaded model gives the same results as the fresh model"""
+    history, monitoring, dates = history_monitoring_synthetic
+    nc_path = tmp_path / 'monitor.nc'
+    mask = np.ones(history.shape[1:], dtype=np.uint8)
+    mask[0, 0] = monitor_constant
+    monitor_ = monitor_cls(mask=mask)
+    monitor_.fit(dataarray=history, method='OLS')
+    monitor_.to_netcdf(nc_path)
+    monitor_load = monitor_cls.from_netcdf(nc_path)
+    # Null normalization factors (null sigma or histsize) are infinite
+    np.testing.assert_array_equal(monitor_._get_inv_norm(),
+                                  monitor_load._get_inv_norm())
+    assert np.isinf(monitor_load._get_inv_norm()[0, 0])
+    for array, date in zip(monitoring, dates):
+        monitor_.monitor(array=array, date=date)
+        monitor_load.monitor(array=array, date=date)
+    if monitor_constant:
+        # Null sigma results in an infinite process and a confirmed break
+        assert np.isinf(monitor_.process[0, 0])
+        assert monitor_.mask[0, 0] == 3
+    for attr in ['mask', 'detection_date', 'process', 'boundary']:
+        np.testing.assert_array_equal(getattr(monitor_, attr),
+                                      getattr(monitor_load, attr))
+
+
+@pytest.mark.parametrize('method', ['OLS', 'RIRLS', 'ROC'])
+def test_cusum_fit_flat(method, history_monitoring_synthetic):
+    """History statistics computed on flat arrays match the raster formulas"""
+    history, _, _ = history_monitoring_synthetic
+    mask = np.ones(history.shape[1:], dtype=np.uint8)
+    mask[0, 1] = 0
+    monitor_ = cusum.CuSum(mask=mask)
+    monitor_.fit(dataarray=history, method=method)
+    # Raster formulas applied to the residuals returned by _fit
+    monitor_ref = cusum.CuSum(mask=mask)
+    X = monitor_ref.build_design_matrix(
+        history, trend=monitor_ref.trend,
+        harmonic_order=monitor_ref.harmonic_order)
+    beta, residuals = monitor_ref._fit(X, history, method=method)
+    histsize = np.sum(~np.isnan(residuals), axis=0).astype(np.uint16)
+    histsize[monitor_ref.mask != 1] = 0
+    sigma = np.nanstd(residuals, axis=0, ddof=X.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        process = np.nancumsum(residuals / (sigma * np.sqrt(histsize)),
+                               axis=0)[-1]
+    is_fit = monitor_ref.mask == 1
+    np.testing.assert_array_equal(monitor_.mask, monitor_ref.mask)
+    np.testing.assert_array_equal(monitor_.beta, beta)
+    np.testing.assert_array_equal(monitor_.histsize, histsize)
+    np.testing.assert_array_equal(monitor_.n, histsize)
+    assert not np.shares_memory(monitor_.n, monitor_.histsize)
+    np.testing.assert_allclose(monitor_.sigma[is_fit], sigma[is_fit],
+                               rtol=1e-5)
+    np.testing.assert_allclose(monitor_.process[is_fit], process[is_fit],
+                               rtol=1e-4, atol=1e-5)
+    # Pixels that are not fitted (not monitored, unstable or short history)
+    assert not np.any(monitor_.histsize[~is_fit])
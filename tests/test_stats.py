@@ -15,9 +15,11 @@
 
 from scipy.stats import norm
 import numpy as np
+import pandas as pd
 import pytest
 
 import nrt.stats as st
+from nrt.utils import build_regressors
 
 
 # validate ncdf against scipy norm.cdf
@@ -28,6 +30,24 @@ def test_ncdf(test_input):
     np.testing.assert_allclose(numba_result, scipy_result)
 
 
+def test_ncdf_vec():
+    x = np.linspace(-5, 5, 101)
+    np.testing.assert_allclose(st.ncdf_vec(x), norm.cdf(x))
+    np.testing.assert_allclose(st.ncdf_vec(x), [st.ncdf(v) for v in x],
+                               atol=1e-7)
+
+
+@pytest.mark.parametrize("size", [1, 2, 15, 16])
+def test_mad(size):
+    rng = np.random.default_rng(0)
+    resid = rng.normal(size=size)
+    expected = np.median(np.abs(resid - np.median(resid))) / 0.6745
+    np.testing.assert_allclose(st.mad(resid), expected)
+    # Nan are ignored
+    resid_nan = np.insert(resid, [0, size], np.nan)
+    np.testing.assert_allclose(st.mad(resid_nan, c=1.), expected * 0.6745)
+
+
 def test_nan_percentile_axis0():
     # test data
     xy = (20, 20, 20)
@@ -35,8 +55,58 @@ def test_nan_percentile_axis0():
     # turn 10% into nan
     rand_nan = np.random.random_sample(xy) < 0.1
     test_data[rand_nan] = np.nan
+    # Time-series with a single valid observation, and without any
+    test_data[:-1, 0, 0] = np.nan
+    test_data[:, 0, 1] = np.nan
 
     q_numba = st.nan_percentile_axis0(test_data, np.array([75, 25]))
-    q_numpy = np.nanpercentile(test_data, [75 ,25], 0)
+    with pytest.warns(RuntimeWarning):
+        q_numpy = np.nanpercentile(test_data, [75 ,25], 0)
 
     np.testing.assert_allclose(q_numba, q_numpy)
+
+
+def test_nanlstsq():
+    rng = np.random.default_rng(0)
+    X = np.c_[np.ones(50), rng.random((50, 3))]
+    y = rng.random((50, 200))
+    # Mix of columns sharing a few nan patterns and columns with random nans
+    y[5:10, :80] = np.nan
+    y[20, 80:120] = np.nan
+    y[:, 160:][rng.random((50, 40)) < 0.2] = np.nan
+    beta = st.nanlstsq(X, y)
+    for idx in range(y.shape[1]):
+        isna = np.isnan(y[:, idx])
+        expected = np.linalg.lstsq(X[~isna], y[~isna, idx], rcond=None)[0]
+        np.testing.assert_allclose(beta[:, idx], expected)
+
+
+def test_nanlstsq_short_series():
+    # Time-series of 11 clustered observations (minimum accepted by
+    # BaseNrt._mask_short_series for 8 regressors) with a trend regressor in
+    # days since epoch; normal equations of X are very badly conditioned
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2016-01-01', periods=200, freq='5D')
+    X = build_regressors(dates, trend=True, harmonic_order=3)
+    y = np.full((200, 300), np.nan)
+    for idx in range(y.shape[1]):
+        start = rng.integers(0, 160)
+        obs = rng.choice(np.arange(start, start + 40), 11, replace=False)
+        y[obs, idx] = rng.normal(0.6, 0.1, 11)
+    beta = st.nanlstsq(X, y)
+    for idx in range(y.shape[1]):
+        isna = np.isnan(y[:, idx])
+        expected = np.linalg.lstsq(X[~isna], y[~isna, idx], rcond=None)[0]
+        np.testing.assert_allclose(np.dot(X[~isna], beta[:, idx]),
+                                   np.dot(X[~isna], expected), atol=1e-6)
+
+
+def test_cholesky():
+    rng = np.random.default_rng(0)
+    A = rng.random((20, 4))
+    L, is_pd = st._cholesky(np.dot(A.T, A))
+    assert is_pd
+    np.testing.assert_allclose(L, np.linalg.cholesky(np.dot(A.T, A)))
+    # Not positive definite
+    _, is_pd = st._cholesky(np.array([[1., 2.], [2., 1.]]))
+    assert not is_pd
@@ -0,0 +1,37 @@
+# Copyright (C) 2022 European Union (Joint Research Centre)
+#
+# Licensed under the EUPL, Version 1.2 or – as soon they will be approved by
+# the European Commission - subsequent versions of the EUPL (the "Licence");
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at:
+#
+#   https://joinup.ec.europa.eu/software/page/eupl
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the Licence is distributed on an "AS IS" basis,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the Licence for the specific language governing permissions and
+# limitations under the Licence.
+
+import numpy as np
+import pandas as pd
+
+from nrt import utils
+
+
+def test_datetimeIndex_to_decimal_dates():
+    dates = pd.DatetimeIndex(['2015-01-01', '2015-07-02 12:00', '2016-02-29',
+                              '2016-12-31', '2020-06-15 06:30'])
+    expected = [utils.dt_to_decimal(dt.to_pydatetime()) for dt in dates]
+    np.testing.assert_allclose(utils.datetimeIndex_to_decimal_dates(dates),
+                               expected)
+
+
+def test_build_regressors():
+    dates = pd.date_range('2015-01-01', '2017-01-01', freq='7D')
+    X = utils.build_regressors(dates, trend=True, harmonic_order=2)
+    assert X.shape == (len(dates), 6)
+    np.testing.assert_array_equal(X[:,0], 1)
+    np.testing.assert_array_equal(X[:,1], (dates - pd.Timestamp(1970)).days)
+    # First day of the year has a decimal part of zero
+    np.testing.assert_allclose(X[0,2:], [1, 1, 0, 0], atol=1e-12)
@@ -155,3 +155,41 @@ def test_process_boundary_mosum(X_y_dates_romania, mosum_result):
     # Sigma
     np.testing.assert_allclose(mosum_result[3],
                                mosum_monitor.sigma.ravel()[:-1], rtol=1e-6)
+
+
+def test_cusum_update():
+    """In place update is equivalent to the former array expressions"""
+    rng = np.random.default_rng(0)
+    shape = (6, 7)
+    critval = cs._cusum_ols_test_crit(0.05)
+    histsize = rng.integers(20, 40, shape).astype(np.uint16)
+    n = histsize.copy()
+    n[:3] += rng.integers(1, 10, (3, 7)).astype(np.uint16)
+    sigma = rng.uniform(0.01, 0.1, shape)
+    inv_norm = (1 / (sigma * np.sqrt(histsize))).astype(np.float32)
+    process = rng.normal(size=shape).astype(np.float32)
+    boundary = np.full(shape, np.nan, dtype=np.float32)
+    residuals = rng.normal(0, 0.05, shape)
+    is_valid = rng.random(shape) < 0.6
+    # Former numpy implementation of CuSum._update_process
+    n_expected = n + is_valid
+    x = n_expected / histsize
+    with np.errstate(divide='ignore', invalid='ignore'):
+        boundary_expected = np.where(
+            is_valid,
+            np.sqrt(x * (x - 1) * (critval**2 + np.log(x / (x - 1)))),
+            boundary)
+    process_expected = np.where(is_valid, process + residuals * inv_norm,
+                                process)
+    histsize_before = histsize.copy()
+    process_before = process.copy()
+    cs._cusum_update(process, boundary, n, histsize, inv_norm, residuals,
+                     is_valid, critval)
+    np.testing.assert_array_equal(n, n_expected)
+    np.testing.assert_array_equal(histsize, histsize_before)
+    np.testing.assert_allclose(boundary, boundary_expected, rtol=1e-6)
+    np.testing.assert_allclose(process, process_expected, rtol=1e-6)
+    # Invalid pixels are left untouched
+    assert np.all(np.isnan(boundary[~is_valid]))
+    np.testing.assert_array_equal(process[~is_valid],
+                                  process_before[~is_valid])